@@ -14,6 +14,10 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
 from functools import wraps
+from db.extensions import db
+from db import warmup
+from web.compression import init_compression
+from web.payloads import list_response, payload_metrics
 
 
 #allows the front and ackend servers to communicate effectively between themselves
@@ -30,12 +34,24 @@ app.config['JWT_ACCESS_LIFESPAN'] = {'hours': 24}
 app.config['JWT_REFRESH_LIFESPAN'] = {'days': 30}
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = flask_sqlalchemy.SQLAlchemy(app)
+app.config['WARMUP_CONNECTIONS'] = int(os.getenv('WARMUP_CONNECTIONS', 2))
+app.config['DB_CONNECT_TIMEOUT'] = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+#bounds every new connection, so an unreachable database fails the warm-up in gunicorn.conf.py
+#(and the readiness probe) quickly instead of blocking the worker past gunicorn's timeout
+if (app.config['SQLALCHEMY_DATABASE_URI'] or '').startswith('postgres'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'connect_timeout': app.config['DB_CONNECT_TIMEOUT']},
+    }
+#the same db instance as the models in db/models.py, so the app uses a single connection pool
+db.init_app(app)
 
 
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+#gzip/deflate (and brotli when installed) compression of the responses + payload size metrics
+init_compression(app)
+
 
 
 
@@ -49,7 +65,7 @@ class User(db.Model, UserMixin):
     grad_year = db.Column(db.Integer)
     current_work = db.Column(db.Integer)
     admin_auth = db.Column(db.Boolean)
-    resume = db.Column(db.VARBINARY)
+    resume = db.Column(db.LargeBinary)#bytea on Postgres, which has no VARBINARY
     resume_public = db.Column(db.Boolean)
     image = image_attachment('UserPicture')
     cover = image_attachment('UserCover')
@@ -162,6 +178,34 @@ def home():
     }
 
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    """
+    Liveness probe, only shows that the worker is up and serving requests
+    """
+    return {'status': 'alive'}
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe, checks that a pooled database connection answers a `SELECT 1`
+    Returns 503 when the database can't be reached
+    .. example::
+       $ curl http://localhost:5000/api/health/ready
+    """
+    try:
+        latency = warmup.probe(db.engine)
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': e.__class__.__name__}), 503
+    return {
+        'status': 'ready',
+        'warm': warmup.is_warm(),
+        'database_latency_ms': round(latency * 1000, 2),
+        'pool': db.engine.pool.status()
+    }
+
+
 #Rouet to add teh logged in user to the 
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -224,31 +268,45 @@ def logout():
     return 'Logged out'
 
 
+USER_LIST_FIELDS = ('id', 'name', 'email', 'grad_year', 'current_work', 'admin_auth',
+                    'has_resume', 'resume_public', 'roles')
+
+
+def users_list_query():
+    """
+    Selects the USER_LIST_FIELDS columns only
+    The password hash and the binary resume are left out, they don't belong in a list;
+    the database tells us whether there is a resume without sending it
+    """
+    return User.query.with_entities(
+        User.id, User.name, User.email, User.grad_year, User.current_work, User.admin_auth,
+        User.resume.isnot(None), User.resume_public, User.roles
+    )
+
+
 def users_serializer(user):
     """
     Serializes query data so that it is consumable by the front end which expects
     JSON objects or arrays
     """
-    return{
-    'id': user.id,   
-    "name": user.name,
-    "email": user.email,
-    "password": user.password,
-    "grad_year": user.grad_year,
-    "current_work": user.current_work,
-    "admin_auth": user.admin_auth,
-    "resume": user.resume,
-    "resume_public": user.resume_public,
-    "roles": user.roles
-    }
+    return dict(zip(USER_LIST_FIELDS, user))
 
 @app.route('/api/users', methods = ['GET'])
 def get_all_users():
     """
     Queries the database to get all users
-    We apply the serializer to each user object to return an array of JSON objects
+    We apply the serializer to each user row to return an array of JSON objects,
+    or an array of arrays with a header row for `?format=compact`
+    """
+    return list_response(list(map(users_serializer, users_list_query())), fields=USER_LIST_FIELDS)
+
+
+@app.route('/api/metrics/payloads', methods=['GET'])
+def payload_sizes():
+    """
+    Response sizes per route (before and after compression) since the worker started
     """
-    return jsonify(list(map(users_serializer, User.query.all())))
+    return jsonify(payload_metrics.snapshot())
 
 
 @app.route('/api/refresh', methods=['POST'])
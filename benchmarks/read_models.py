@@ -0,0 +1,165 @@
+"""
+Memory and throughput of loading rows as ORM objects vs the read models in db/read_models.py
+Runs against an in-memory SQLite database, or the scratch database in BENCHMARK_DATABASE_URL
+(never the app's DATABASE_URL), empty or migrated. The projects belong to business profiles
+the benchmark creates, only the rows it inserted are read and deleted.
+.. example::
+   $ python -m benchmarks.read_models --rows 100000
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+import uuid
+
+from flask import Flask
+
+from db.extensions import db
+from db.models import BusinessProfile, Project
+from db.read_models import ProjectRow, fetch_rows
+from db.reference import REFERENCE_MODELS, reference_ids
+
+PROFILES = 1000
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite://')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+RUN_ID = uuid.uuid4().hex
+# every inserted project's description starts with this, to tell them apart from other rows
+MARKER = 'benchmark-%s ' % RUN_ID
+# and every inserted profile's email ends with this
+PROFILE_EMAIL_DOMAIN = '@benchmark-%s.invalid' % RUN_ID
+
+
+def benchmark_rows():
+    return Project.query.filter(Project.description.startswith(MARKER))
+
+
+def benchmark_profiles():
+    return BusinessProfile.query.filter(BusinessProfile.email.endswith(PROFILE_EMAIL_DOMAIN))
+
+
+def populate_profiles():
+    """
+    Business profiles for the projects to belong to, returns their ids
+    """
+    db.session.execute(BusinessProfile.__table__.insert(), [
+        {
+            # names are unique and at most 20 characters
+            'name': 'bench %s %d' % (RUN_ID[:8], i),
+            'country': 'Kenya',
+            'phone_number': '+254700000000',
+            'user_type_id': min(reference_ids('user_types')),
+            'business_type_id': min(reference_ids('business_types')),
+            'heard_about_by': 'benchmark',
+            'email': '%d%s' % (i, PROFILE_EMAIL_DOMAIN),
+            'email_verified': False,
+            'password': 'not a password hash, nobody can log in',
+            'business_size': '1',
+            'country_code': '+254',
+            'address_line_1': '-',
+            'address_line_2': '-',
+            'city': '-',
+            'post_code': '-',
+            'industry_type_id': min(reference_ids('industry_types')),
+        }
+        for i in range(PROFILES)
+    ])
+    return [profile_id for profile_id, in benchmark_profiles().with_entities(BusinessProfile.profile_id)]
+
+
+def populate(rows: int):
+    # checkfirst leaves the tables of a migrated database alone, empty ones are created
+    # and the reference tables seeded
+    tables = [model.__table__ for model in REFERENCE_MODELS + (BusinessProfile, Project)]
+    db.metadata.create_all(bind=db.engine, tables=tables)
+
+    profile_ids = populate_profiles()
+    status_ids = sorted(reference_ids('statuses'))
+    industry_type_ids = sorted(reference_ids('industry_types'))
+    db.session.execute(Project.__table__.insert(), [
+        {
+            'business_profile_id': profile_ids[i % len(profile_ids)],
+            'status_id': status_ids[i % len(status_ids)],
+            'description': '%sproject number %d' % (MARKER, i),
+            'region': 'East Africa',
+            'country': 'Kenya',
+            'industry_type_id': industry_type_ids[i % len(industry_type_ids)],
+            'funded_by_equity': bool(i % 2),
+            'equity_type_id': None,
+            'funded_by_debt': not i % 2,
+            'debt_type_id': None,
+            'revenue': i * 10,
+            'ebitda': i,
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def cleanup():
+    benchmark_rows().delete(synchronize_session=False)
+    benchmark_profiles().delete(synchronize_session=False)
+    db.session.commit()
+
+
+def load_orm():
+    return benchmark_rows().all()
+
+
+def load_read_models():
+    return fetch_rows(ProjectRow, benchmark_rows())
+
+
+def measure(load, repeat: int):
+    """
+    Returns the best wall time over `repeat` runs and the peak memory of one run
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = load()
+        timings.append(time.perf_counter() - start)
+        del result
+        db.session.remove()
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    db.session.remove()
+    return count, min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            populate(args.rows)
+            print('%-12s %10s %12s %12s %14s' % ('loader', 'rows', 'seconds', 'rows/s', 'peak MiB'))
+            for name, load in (('orm', load_orm), ('read model', load_read_models)):
+                count, seconds, peak = measure(load, args.repeat)
+                print('%-12s %10d %12.3f %12.0f %14.1f' % (name, count, seconds, count / seconds, peak / 2 ** 20))
+        finally:
+            db.session.rollback()
+            cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from werkzeug.security import generate_password_hash
+
+from db.extensions import db
+from db.models import BusinessProfile
+from db.reference import reference_ids
+
+DEFAULT_BATCH_SIZE = 500
+
+INSERTED = "inserted"
+UPDATED = "updated"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+PROFILE_TABLE = BusinessProfile.__table__
+PROFILE_FIELDS = tuple(column.name for column in PROFILE_TABLE.columns if not column.primary_key)
+REQUIRED_FIELDS = tuple(
+    column.name
+    for column in PROFILE_TABLE.columns
+    if not column.primary_key and not column.nullable and column.default is None
+)
+FIELD_TYPES = {column.name: column.type.python_type for column in PROFILE_TABLE.columns}
+NAME_MAX_LENGTH = PROFILE_TABLE.c.name.type.length
+# column -> reference table it points to, e.g. user_type_id -> user_types
+REFERENCE_FIELDS = {
+    column.name: next(iter(column.foreign_keys)).column.table.name
+    for column in PROFILE_TABLE.columns
+    if column.foreign_keys
+}
+
+# bounds of a postgres INTEGER, bigger values would fail the whole insert
+INTEGER_MIN = -2 ** 31
+INTEGER_MAX = 2 ** 31 - 1
+
+# postgres SQLSTATE of a unique constraint violation
+UNIQUE_VIOLATION = "23505"
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_PATTERN = re.compile(r"^\+?\d{6,15}$")
+DIALLING_CODE_PATTERN = re.compile(r"^\+?\d{1,4}$")
+ISO_COUNTRY_CODE_PATTERN = re.compile(r"^[A-Z]{2,3}$")
+INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+BOOLEAN_STRINGS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+@dataclass
+class IngestionOutcome:
+    """
+    Result of ingesting one record
+     :param index: position of the record in the input
+     :param status: inserted, updated, duplicate or invalid
+     :param profile_id: id of the inserted/updated profile
+     :param errors: validation errors or the reason the record was skipped
+    """
+
+    index: int
+    status: str
+    profile_id: Optional[int] = None
+    errors: List[str] = field(default_factory=list)
+
+
+def normalise_phone_number(value: str) -> str:
+    return re.sub(r"[\s\-().]", "", value)
+
+
+def normalise_country_code(value: str) -> str:
+    value = value.strip()
+    if DIALLING_CODE_PATTERN.match(value):
+        return "+" + value.lstrip("+")
+    return value.upper()
+
+
+def _coerce(name: str, value: Any) -> Any:
+    """
+    Converts a raw value to the python type of its column, None for empty values
+    Raises ValueError when the value can't be converted
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    if value is None:
+        return None
+
+    expected = FIELD_TYPES[name]
+    if expected is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+    elif expected is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in BOOLEAN_STRINGS:
+            return BOOLEAN_STRINGS[value.lower()]
+    elif expected is int:
+        if isinstance(value, str) and INTEGER_PATTERN.match(value):
+            value = int(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            if not INTEGER_MIN <= value <= INTEGER_MAX:
+                raise ValueError("invalid %s: %d is out of range" % (name, value))
+            return value
+    raise ValueError("invalid %s: expected %s, got %r" % (name, expected.__name__, value))
+
+
+def _normalise_profile(
+        record: Dict[str, Any], reference: Optional[Dict[str, FrozenSet[int]]] = None
+) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    errors = []
+    row = {}
+    for name in PROFILE_FIELDS:
+        try:
+            value = _coerce(name, record.get(name))
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+        # fields without a value are left out, so that updates don't overwrite them
+        if value is not None:
+            row[name] = value
+    if errors:
+        return None, errors
+
+    missing = [name for name in REQUIRED_FIELDS if name not in row]
+    if missing:
+        return None, ["missing field: %s" % name for name in missing]
+
+    if reference is not None:
+        for name, ids in reference.items():
+            if row[name] not in ids:
+                errors.append("unknown %s: %d" % (name, row[name]))
+
+    row["email"] = row["email"].lower()
+    if not EMAIL_PATTERN.match(row["email"]):
+        errors.append("invalid email: %s" % row["email"])
+
+    if len(row["name"]) > NAME_MAX_LENGTH:
+        errors.append("name longer than %d characters" % NAME_MAX_LENGTH)
+
+    for name in ("phone_number", "office_phone_number"):
+        if name in row:
+            row[name] = normalise_phone_number(row[name])
+            if not PHONE_PATTERN.match(row[name]):
+                errors.append("invalid %s: %s" % (name, row[name]))
+
+    row["country_code"] = normalise_country_code(row["country_code"])
+    if not (DIALLING_CODE_PATTERN.match(row["country_code"])
+            or ISO_COUNTRY_CODE_PATTERN.match(row["country_code"])):
+        errors.append("invalid country_code: %s" % row["country_code"])
+
+    if errors:
+        return None, errors
+
+    row["password"] = generate_password_hash(row["password"])
+    return row, []
+
+
+def normalise_profile(
+        record: Dict[str, Any], reference: Optional[Dict[str, FrozenSet[int]]] = None
+) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Validates and normalises one raw signup record and replaces the plaintext password
+    with its hash
+    Runs in the worker processes of ingest_business_profiles, so it only works on plain dicts
+    and never raises: a record that can't be processed is reported as invalid
+    `reference` maps the REFERENCE_FIELDS to their valid ids, they aren't checked without it
+    Returns the row to insert (None when invalid), holding only the fields the record
+    has a value for, and the list of errors
+    """
+    try:
+        return _normalise_profile(record, reference)
+    except Exception as e:
+        return None, ["could not be processed: %s" % e]
+
+
+def _batches(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _classify(
+        batch: List[Tuple[int, Dict[str, Any]]],
+        existing: List[Tuple[int, str, str]],
+        outcomes: List[Optional[IngestionOutcome]],
+        update_existing: bool,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Sets the outcome of the records that can't be written because of the existing
+    (profile_id, name, email) rows or an earlier record of the batch
+    Returns the records to write
+    """
+    existing_emails = {email for _, _, email in existing}
+    name_owners = {name: email for _, name, email in existing}
+
+    rows = []
+    seen_emails, seen_names = set(), set()
+    for index, row in batch:
+        email, name = row["email"], row["name"]
+        if email in seen_emails or name in seen_names:
+            outcomes[index] = IngestionOutcome(index, DUPLICATE, errors=["duplicate within import"])
+        elif email in existing_emails and not update_existing:
+            outcomes[index] = IngestionOutcome(index, DUPLICATE, errors=["email already registered"])
+        elif name_owners.get(name, email) != email:
+            outcomes[index] = IngestionOutcome(index, DUPLICATE, errors=["name already taken"])
+        else:
+            rows.append((index, row))
+        seen_emails.add(email)
+        seen_names.add(name)
+    return rows
+
+
+def _write_statement(
+        rows: List[Tuple[int, Dict[str, Any]]], columns: Tuple[str, ...], update_existing: bool
+):
+    """
+    One `INSERT ... ON CONFLICT ... RETURNING profile_id, email` for rows that all have
+    values for `columns`
+    """
+    statement = insert(PROFILE_TABLE).values([row for _, row in rows])
+    if update_existing:
+        # only the fields the records have a value for, the others keep their stored value
+        statement = statement.on_conflict_do_update(
+            index_elements=[PROFILE_TABLE.c.email],
+            set_={name: statement.excluded[name] for name in columns if name != "email"},
+        )
+    else:
+        # also covers profiles created concurrently since the uniqueness check
+        statement = statement.on_conflict_do_nothing()
+    return statement.returning(PROFILE_TABLE.c.profile_id, PROFILE_TABLE.c.email)
+
+
+def _write(
+        rows: List[Tuple[int, Dict[str, Any]]], columns: Tuple[str, ...], update_existing: bool
+) -> Dict[str, int]:
+    """
+    Returns email -> profile_id of the written rows
+    """
+    statement = _write_statement(rows, columns, update_existing)
+    return {email: profile_id for profile_id, email in db.session.execute(statement)}
+
+
+def _rejected(index: int, error: DBAPIError) -> IngestionOutcome:
+    """
+    Outcome of a record the database refused, a duplicate when it broke a unique constraint
+    """
+    message = str(error.orig).splitlines()[0]
+    if getattr(error.orig, "pgcode", None) == UNIQUE_VIOLATION:
+        return IngestionOutcome(index, DUPLICATE, errors=["conflict: %s" % message])
+    return IngestionOutcome(index, INVALID, errors=["rejected by the database: %s" % message])
+
+
+def _ingest_batch(
+        batch: List[Tuple[int, Dict[str, Any]]],
+        outcomes: List[Optional[IngestionOutcome]],
+        update_existing: bool,
+):
+    emails = {row["email"] for _, row in batch}
+    names = {row["name"] for _, row in batch}
+
+    # one set-based uniqueness check for the whole batch
+    existing = (
+        db.session.query(BusinessProfile.profile_id, BusinessProfile.name, BusinessProfile.email)
+        .filter(or_(BusinessProfile.email.in_(emails), BusinessProfile.name.in_(names)))
+        .all()
+    )
+    existing_emails = {email for _, _, email in existing}
+    rows = _classify(batch, existing, outcomes, update_existing)
+
+    # a multi-row insert needs the same columns in every row
+    groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+    for index, row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append((index, row))
+
+    written = {}
+    for columns, group in groups.items():
+        try:
+            written.update(_write(group, columns, update_existing))
+            db.session.commit()
+        except DBAPIError:
+            # e.g. a name taken concurrently; retry one by one to find the records at fault
+            db.session.rollback()
+            for index, row in group:
+                try:
+                    written.update(_write([(index, row)], columns, update_existing))
+                    db.session.commit()
+                except DBAPIError as e:
+                    db.session.rollback()
+                    outcomes[index] = _rejected(index, e)
+
+    for index, row in rows:
+        if outcomes[index] is not None:
+            continue
+        profile_id = written.get(row["email"])
+        if profile_id is None:
+            outcomes[index] = IngestionOutcome(index, DUPLICATE, errors=["created concurrently"])
+        elif row["email"] in existing_emails:
+            outcomes[index] = IngestionOutcome(index, UPDATED, profile_id)
+        else:
+            outcomes[index] = IngestionOutcome(index, INSERTED, profile_id)
+
+
+def ingest_business_profiles(
+        records: List[Dict[str, Any]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: Optional[int] = None,
+        update_existing: bool = False,
+) -> List[IngestionOutcome]:
+    """
+    Bulk signup of business profiles, e.g. for partner imports
+    Records are dicts keyed on the BusinessProfile column names. They are validated and
+    their passwords hashed in a process pool, then written with one uniqueness query and
+    one `INSERT ... ON CONFLICT` per batch (Postgres only)
+     :param records: raw profile records
+     :param batch_size: number of records per insert statement
+     :param workers: size of the validation process pool, defaults to the number of CPUs
+     :param update_existing: update profiles whose email is already registered instead
+        of reporting them as duplicates; only the fields a record has a value for are updated
+    Returns one IngestionOutcome per record, in input order
+    """
+    outcomes: List[Optional[IngestionOutcome]] = [None] * len(records)
+
+    # the workers have no database access, they check the ids against these sets
+    reference = {name: reference_ids(table) for name, table in REFERENCE_FIELDS.items()}
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(records) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        normalise = partial(normalise_profile, reference=reference)
+        results = list(pool.map(normalise, records, chunksize=chunksize))
+
+    valid = []
+    for index, (row, errors) in enumerate(results):
+        if row is None:
+            outcomes[index] = IngestionOutcome(index, INVALID, errors=errors)
+        else:
+            valid.append((index, row))
+
+    for batch in _batches(valid, batch_size):
+        _ingest_batch(batch, outcomes, update_existing)
+
+    return outcomes
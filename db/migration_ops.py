@@ -0,0 +1,151 @@
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.sql.elements import ClauseElement
+
+# rough throughput figures used only for the dry-run time estimates
+INDEX_ROWS_PER_SECOND = 500_000
+BACKFILL_ROWS_PER_SECOND = 20_000
+
+log = logging.getLogger("alembic.runtime.dry_run")
+
+
+def is_dry_run() -> bool:
+    """
+    True when the migration was started with `-x dry_run=true`
+    """
+    flag = context.get_x_argument(as_dictionary=True).get("dry_run", "")
+    return flag.lower() in ("1", "true", "yes")
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def estimate_rows(table_name: str) -> int:
+    """
+    Estimates the number of rows in a table
+    On Postgres the planner statistics are used so that big tables are not scanned,
+    falling back to an exact count when the table has never been analyzed
+    """
+    bind = op.get_bind()
+    if _is_postgres():
+        estimate = bind.execute(
+            sa.text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            name=table_name,
+        ).scalar()
+        if estimate is not None and estimate > 0:
+            return estimate
+    return bind.execute(
+        sa.select([sa.func.count()]).select_from(sa.table(table_name))
+    ).scalar()
+
+
+def _report(action: str, table_name: str, rows: int, seconds: float):
+    log.info(
+        "[dry run] %s on %s: ~%d rows, ~%.1fs estimated", action, table_name, rows, seconds
+    )
+
+
+def create_index_concurrently(
+        index_name: str, table_name: str, columns: List[str], **kw: Any
+):
+    """
+    Creates an index without taking a write lock on the table
+    On Postgres this runs `CREATE INDEX CONCURRENTLY` outside of the migration
+    transaction; other databases get a plain `CREATE INDEX`
+    """
+    if is_dry_run():
+        rows = estimate_rows(table_name)
+        _report("create index %s" % index_name, table_name, rows, rows / INDEX_ROWS_PER_SECOND)
+        return
+
+    if not _is_postgres():
+        op.create_index(index_name, table_name, columns, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, **kw)
+
+
+def drop_index_concurrently(index_name: str, table_name: str):
+    """
+    Drops an index without taking a write lock on the table (Postgres only)
+    """
+    if is_dry_run():
+        _report("drop index %s" % index_name, table_name, 0, 0)
+        return
+
+    if not _is_postgres():
+        op.drop_index(index_name, table_name=table_name)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+
+
+def backfill(
+        table_name: str,
+        pk: str,
+        values: Dict[str, Any],
+        where: Optional[ClauseElement] = None,
+        batch_size: int = 5000,
+        pause: float = 0.0,
+) -> int:
+    """
+    Updates a table in primary key ranges of `batch_size` rows, committing each
+    batch on its own so that row locks are only held for one batch at a time
+     :param table_name: table to update
+     :param pk: name of the integer primary key column used to walk the table
+     :param values: column name -> new value (or SQL expression)
+     :param where: optional extra filter, e.g. sa.text("status_id IS NULL")
+     :param batch_size: number of primary key values covered by a batch
+     :param pause: seconds to sleep between batches to let replicas catch up
+    Returns the number of updated rows
+    """
+    table = sa.table(table_name, sa.column(pk), *(sa.column(name) for name in values))
+    pk_column = table.c[pk]
+
+    def update_statement():
+        statement = table.update().values(**values)
+        if where is not None:
+            statement = statement.where(where)
+        return statement
+
+    if context.is_offline_mode():
+        # ranges can't be computed without a connection, emit a single statement
+        op.execute(update_statement())
+        return 0
+
+    if is_dry_run():
+        rows = estimate_rows(table_name)
+        batches = math.ceil(rows / batch_size)
+        _report(
+            "backfill of %s in %d batches" % (", ".join(values), batches),
+            table_name,
+            rows,
+            rows / BACKFILL_ROWS_PER_SECOND + batches * pause,
+        )
+        return 0
+
+    low, high = op.get_bind().execute(
+        sa.select([sa.func.min(pk_column), sa.func.max(pk_column)])
+    ).first()
+    if low is None:
+        return 0
+
+    updated = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()  # the autocommit connection, not the migration transaction's
+        for start in range(low, high + 1, batch_size):
+            statement = update_statement().where(
+                sa.and_(pk_column >= start, pk_column < start + batch_size)
+            )
+            updated += bind.execute(statement).rowcount
+            if pause:
+                time.sleep(pause)
+    return updated
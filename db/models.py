@@ -3,6 +3,7 @@ from sqlalchemy.sql.schema import Table
 from sqlalchemy.engine.base import Connection
 from dataclasses import dataclass
 from typing import Optional
+from werkzeug.security import generate_password_hash, check_password_hash
 
 from db.extensions import db
 
@@ -21,9 +22,14 @@ class Deal(db.Model):
     deal_id: int
     business_profile_id: int
     name: str
-    status: str
+    status_id: str
 
     __tablename__ = "deals"
+    # per-profile listings and counts in db/repositories.py, by status and over all statuses
+    __table_args__ = (
+        db.Index("ix_deals_business_profile_id_status_id_deal_id", "business_profile_id", "status_id", "deal_id"),
+        db.Index("ix_deals_business_profile_id_deal_id", "business_profile_id", "deal_id"),
+    )
 
     deal_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     business_profile_id = db.Column(
@@ -52,9 +58,14 @@ class Transaction(db.Model):
     transaction_id: int
     business_profile_id: int
     name: str
-    status: str
+    status_id: str
 
     __tablename__ = "transactions"
+    # per-profile listings and counts in db/repositories.py, by status and over all statuses
+    __table_args__ = (
+        db.Index("ix_transactions_business_profile_id_status_id_transaction_id", "business_profile_id", "status_id", "transaction_id"),
+        db.Index("ix_transactions_business_profile_id_transaction_id", "business_profile_id", "transaction_id"),
+    )
 
     transaction_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     business_profile_id = db.Column(
@@ -104,6 +115,11 @@ class Project(db.Model):
     ebitda: int
 
     __tablename__ = "projects"
+    # per-profile listings and counts in db/repositories.py, by status and over all statuses
+    __table_args__ = (
+        db.Index("ix_projects_business_profile_id_status_id_project_id", "business_profile_id", "status_id", "project_id"),
+        db.Index("ix_projects_business_profile_id_project_id", "business_profile_id", "project_id"),
+    )
 
     project_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     business_profile_id = db.Column(db.Integer, db.ForeignKey("business_profiles.profile_id"), nullable=False)
@@ -161,7 +177,7 @@ class BusinessProfile(db.Model):
      :param business_type_id: business type id of the particular profile
      :param email: email address of the particular profile
      :param email_verified: if the profile's email is verified
-     :param password: password of a particular profile (no encryption is used as of now)
+     :param password: salted hash of the password of a particular profile
      :param website: website of the profile
      :param business_size: business size of the profile
      :param country_code: country code of the profile
@@ -228,9 +244,10 @@ class BusinessProfile(db.Model):
     industry_type_id = db.Column(
         db.Integer, db.ForeignKey("industry_types.industry_type_id"), nullable=False
     )
-    projects = db.relationship("Project", backref="business_profiles", lazy="subquery")
-    deals = db.relationship("Deal", backref="business_profiles", lazy="subquery")
-    transactions = db.relationship("Transaction", backref="business_profiles", lazy="subquery")
+    # dynamic so that loading a profile doesn't load all of its rows, use db/repositories.py for paged access
+    projects = db.relationship("Project", backref="business_profiles", lazy="dynamic")
+    deals = db.relationship("Deal", backref="business_profiles", lazy="dynamic")
+    transactions = db.relationship("Transaction", backref="business_profiles", lazy="dynamic")
 
     def __init__(
             self,
@@ -262,7 +279,7 @@ class BusinessProfile(db.Model):
         self.heard_about_by = heard_about_by
         self.email = email
         self.email_verified = email_verified
-        self.password = password
+        self.password = generate_password_hash(password)  # only the hash is stored
         self.website = website
         self.business_size = business_size
         self.country_code = country_code
@@ -275,6 +292,9 @@ class BusinessProfile(db.Model):
         self.industry_type_id = industry_type_id
 
 
+    def check_password(self, password: str) -> bool:
+        return check_password_hash(self.password, password)
+
     @classmethod
     def lookup(cls, name: str):
         return cls.query.filter_by(name=name).one_or_none()
@@ -336,7 +356,7 @@ class IndustryType(db.Model):
     industry_type_id: int
     industry_type: str
 
-    __tablename__ = "business_types"
+    __tablename__ = "industry_types"
 
     industry_type_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     industry_type = db.Column(db.String(), nullable=False)
@@ -456,11 +476,11 @@ def insert_initial_statuses(target: Table, connection: Connection, **kw):
         status='Active'
     )
     status_5 = Status(
-        status_id=2,
+        status_id=5,
         status='Approved'
     )
     status_6 = Status(
-        status_id=2,
+        status_id=6,
         status='Non-Active'
     )
     db.session.add(status_1)
@@ -482,7 +502,7 @@ def insert_initial_equity_types(target: Table, connection: Connection, **kw):
         equity_type='Private Equity'
     )
     equity_type_3 = EquityType(
-        equity_type_id=2,
+        equity_type_id=3,
         equity_type='Venture Capital'
     )
     db.session.add(equity_type_1)
@@ -501,7 +521,7 @@ def insert_initial_debt_types(target: Table, connection: Connection, **kw):
         debt_type='Corporate Debt'
     )
     debt_type_3 = DebtType(
-        debt_type_id=2,
+        debt_type_id=3,
         debt_type='Mezzanine'
     )
     db.session.add(debt_type_1)
@@ -0,0 +1,53 @@
+from typing import Any, Iterable, List, NamedTuple, Optional, Type
+
+from db.models import BusinessProfile, Deal, Project, Transaction
+
+
+def _python_type(column) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return Any
+    return Optional[python_type] if column.nullable else python_type
+
+
+def read_model(model, exclude: Iterable[str] = (), name: Optional[str] = None) -> Type[NamedTuple]:
+    """
+    Builds an immutable NamedTuple type with one field per column of `model`
+    Instances have no __dict__ and are not tracked by the session, which makes them
+    much cheaper than the ORM objects for read-only list endpoints
+     :param model: the db.Model to project
+     :param exclude: attribute names to leave out, e.g. password hashes
+     :param name: name of the generated type, defaults to <Model>Row
+    """
+    exclude = set(exclude)
+    attributes = [attr for attr in model.__mapper__.column_attrs if attr.key not in exclude]
+
+    row_type = NamedTuple(
+        name or "%sRow" % model.__name__,
+        [(attr.key, _python_type(attr.columns[0])) for attr in attributes],
+    )
+    # the instrumented attributes passed to Query.with_entities, in field order
+    row_type.entities = tuple(getattr(model, attr.key) for attr in attributes)
+    row_type.model = model
+    return row_type
+
+
+DealRow = read_model(Deal)
+TransactionRow = read_model(Transaction)
+ProjectRow = read_model(Project)
+BusinessProfileRow = read_model(BusinessProfile, exclude=("password",))
+
+
+def fetch_rows(row_type: Type[NamedTuple], query=None) -> List[NamedTuple]:
+    """
+    Runs `query` (by default every row of the model) selecting only the columns of
+    `row_type`, and returns the rows as `row_type` instances
+    Filters, ordering and limits of the query are kept
+    .. example::
+       >>> fetch_rows(ProjectRow, Project.query.filter_by(country="Kenya").limit(50))
+    """
+    if query is None:
+        query = row_type.model.query
+    make = row_type._make
+    return [make(row) for row in query.with_entities(*row_type.entities)]
@@ -0,0 +1,54 @@
+import threading
+from typing import Any, Dict, FrozenSet, Optional
+
+from db.models import BusinessType, DebtType, EquityType, IndustryType, Status, UserType
+from db.read_models import fetch_rows, read_model
+
+REFERENCE_MODELS = (UserType, BusinessType, IndustryType, Status, EquityType, DebtType)
+REFERENCE_ROWS = {model: read_model(model) for model in REFERENCE_MODELS}
+
+# table name -> {primary key: row}, the tables are small and only change with migrations,
+# so they are loaded once per process (see db/warmup.py)
+reference_cache: Dict[str, Dict[int, Any]] = {}
+
+_lock = threading.Lock()
+
+
+def load_reference_caches():
+    """
+    Loads the reference tables (statuses, user types, ...) into reference_cache
+    """
+    loaded = {}
+    for model, row_type in REFERENCE_ROWS.items():
+        pk = model.__mapper__.primary_key[0].key
+        loaded[model.__tablename__] = {getattr(row, pk): row for row in fetch_rows(row_type)}
+    with _lock:
+        reference_cache.update(loaded)
+
+
+def reference_row(model, pk: Any) -> Optional[Any]:
+    """
+    Row of a reference table by primary key, loading the caches on first use
+    String keys such as the deal/transaction status ids are converted to int
+    """
+    if not reference_cache:
+        load_reference_caches()
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return reference_cache.get(model.__tablename__, {}).get(pk)
+
+
+def reference_ids(table: str) -> FrozenSet[int]:
+    """
+    Primary keys of a reference table by table name, loading the caches on first use
+    """
+    if not reference_cache:
+        load_reference_caches()
+    return frozenset(reference_cache.get(table, {}))
+
+
+def status_name(status_id: Any) -> Optional[str]:
+    row = reference_row(Status, status_id)
+    return row.status if row is not None else None
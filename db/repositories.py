@@ -0,0 +1,220 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import get_history
+
+from db.extensions import db
+from db.models import Deal, Project, Transaction
+from db.read_models import DealRow, ProjectRow, TransactionRow, fetch_rows
+from db.reference import status_name
+
+# how long a per-profile count stays cached, commits through the ORM in this process
+# invalidate it earlier
+COUNT_CACHE_TTL = 60
+
+# session.info key of the (table, business_profile_id) counts changed by the transaction
+STALE_COUNTS_KEY = "stale_tenant_counts"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+TENANT_MODELS = (Deal, Transaction, Project)
+READ_MODELS = {Deal: DealRow, Transaction: TransactionRow, Project: ProjectRow}
+
+
+@dataclass
+class Page:
+    """
+    One page of rows belonging to a business profile
+     :param items: the rows of this page, ordered by primary key
+     :param next_after: primary key to pass as `after` for the next page, None on the last page
+    """
+
+    items: List[Any]
+    next_after: Optional[int]
+
+
+class TenantCountCache:
+    """
+    Per-process cache of row counts grouped by status, keyed on (table, business_profile_id)
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, Dict[Any, int]]] = {}
+        # bumped by every invalidation, so that counts queried before it are not stored after it
+        self._generations: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, business_profile_id: int) -> Optional[Dict[Any, int]]:
+        with self._lock:
+            entry = self._entries.get((table, business_profile_id))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return dict(entry[1])
+
+    def generation(self, table: str, business_profile_id: int) -> int:
+        with self._lock:
+            return self._generations.get((table, business_profile_id), 0)
+
+    def set(self, table: str, business_profile_id: int, counts: Dict[Any, int], generation: int):
+        """
+        Stores counts queried when the key was at `generation`, unless it was invalidated since
+        """
+        key = (table, business_profile_id)
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = (time.monotonic() + self.ttl, dict(counts))
+
+    def invalidate(self, table: str, business_profile_id: int):
+        key = (table, business_profile_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+count_cache = TenantCountCache()
+
+
+def _mark_counts_stale(mapper, connection, target):
+    stale = object_session(target).info.setdefault(STALE_COUNTS_KEY, set())
+    table = mapper.local_table.name
+    stale.add((table, target.business_profile_id))
+    # a row moved to another profile also changes the counts of the profile it left
+    for business_profile_id in get_history(target, "business_profile_id").deleted:
+        if business_profile_id is not None:
+            stale.add((table, business_profile_id))
+
+
+def _invalidate_committed_counts(session):
+    # only after the commit, otherwise readers could cache the pre-commit counts again
+    for table, business_profile_id in session.info.pop(STALE_COUNTS_KEY, ()):
+        count_cache.invalidate(table, business_profile_id)
+
+
+def _forget_stale_counts(session):
+    session.info.pop(STALE_COUNTS_KEY, None)
+
+
+for _model in TENANT_MODELS:
+    event.listen(_model, "after_insert", _mark_counts_stale)
+    event.listen(_model, "after_update", _mark_counts_stale)
+    event.listen(_model, "after_delete", _mark_counts_stale)
+
+event.listen(Session, "after_commit", _invalidate_committed_counts)
+event.listen(Session, "after_rollback", _forget_stale_counts)
+
+
+class TenantRepository:
+    """
+    Read access to the deals, transactions and projects of one business profile
+    Every query is filtered on business_profile_id and paged by primary key (keyset
+    pagination), so it is served in index order from the (business_profile_id, status_id, <pk>)
+    indexes, or the (business_profile_id, <pk>) ones when no status is given, no matter
+    how many rows the profile has
+    .. example::
+       >>> repo = TenantRepository(profile.profile_id)
+       >>> page = repo.deals(status_id="4")
+       >>> next_page = repo.deals(status_id="4", after=page.next_after)
+    """
+
+    def __init__(self, business_profile_id: int, page_size: int = DEFAULT_PAGE_SIZE):
+        self.business_profile_id = business_profile_id
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+
+    def query(self, model):
+        """
+        Base query for a model, always scoped to this business profile
+        """
+        return model.query.filter(model.business_profile_id == self.business_profile_id)
+
+    def page(
+            self,
+            model,
+            status_id: Optional[Any] = None,
+            after: Optional[int] = None,
+            limit: Optional[int] = None,
+            row_type=None,
+    ) -> Page:
+        """
+        One page of rows, as ORM objects or as `row_type` read models (see db/read_models.py)
+        """
+        limit = min(limit or self.page_size, MAX_PAGE_SIZE)
+        pk = model.__mapper__.primary_key[0]
+
+        query = self.query(model)
+        if status_id is not None:
+            query = query.filter(model.status_id == status_id)
+        if after is not None:
+            query = query.filter(pk > after)
+
+        # fetching one extra row tells us whether there is a next page without a count
+        query = query.order_by(pk).limit(limit + 1)
+        rows = query.all() if row_type is None else fetch_rows(row_type, query)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return Page(items=rows, next_after=getattr(rows[-1], pk.key))
+        return Page(items=rows, next_after=None)
+
+    def deals(self, status_id: Optional[str] = None, after: Optional[int] = None,
+              limit: Optional[int] = None, row_type=None) -> Page:
+        return self.page(Deal, status_id, after, limit, row_type)
+
+    def transactions(self, status_id: Optional[str] = None, after: Optional[int] = None,
+                     limit: Optional[int] = None, row_type=None) -> Page:
+        return self.page(Transaction, status_id, after, limit, row_type)
+
+    def projects(self, status_id: Optional[int] = None, after: Optional[int] = None,
+                 limit: Optional[int] = None, row_type=None) -> Page:
+        return self.page(Project, status_id, after, limit, row_type)
+
+    def counts_by_status(self, model) -> Dict[Any, int]:
+        """
+        Number of rows per status_id, cached per profile for COUNT_CACHE_TTL seconds
+        Returns a copy, callers may modify it
+        """
+        table = model.__tablename__
+        counts = count_cache.get(table, self.business_profile_id)
+        if counts is None:
+            generation = count_cache.generation(table, self.business_profile_id)
+            rows = (
+                db.session.query(model.status_id, func.count())
+                .filter(model.business_profile_id == self.business_profile_id)
+                .group_by(model.status_id)
+                .all()
+            )
+            counts = dict(rows)
+            count_cache.set(table, self.business_profile_id, counts, generation)
+        return counts
+
+    def count(self, model, status_id: Optional[Any] = None) -> int:
+        counts = self.counts_by_status(model)
+        if status_id is None:
+            return sum(counts.values())
+        return counts.get(status_id, 0)
+
+    def dashboard(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Counts and the first page of each kind of row for the profile dashboard
+        The pages hold read models, the dashboard never modifies the rows; status names
+        come from the reference table cache
+        """
+        dashboard = {}
+        for model in TENANT_MODELS:
+            counts = self.counts_by_status(model)
+            dashboard[model.__tablename__] = {
+                "counts": counts,
+                "status_names": {status_id: status_name(status_id) for status_id in counts},
+                "total": sum(counts.values()),
+                "page": self.page(model, limit=limit, row_type=READ_MODELS[model]),
+            }
+        return dashboard
@@ -0,0 +1,84 @@
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+from db.extensions import db
+from db.reference import load_reference_caches
+from db.repositories import READ_MODELS, TENANT_MODELS, TenantRepository
+
+DEFAULT_WARMUP_CONNECTIONS = 2
+
+log = logging.getLogger(__name__)
+
+_warm = False
+
+
+def is_warm() -> bool:
+    return _warm
+
+
+def probe(engine) -> float:
+    """
+    Checks out a pooled connection and runs `SELECT 1` on it
+    Returns the round trip in seconds, raises if the database can't be reached
+    """
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        connection.scalar(select([1]))
+    return time.perf_counter() - start
+
+
+def warm_pool(engine, connections: int):
+    """
+    Opens `connections` connections at the same time and returns them to the pool,
+    so the first requests don't pay for the connection handshakes
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            connection.scalar(select([1]))
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def run_hot_queries():
+    """
+    Runs the dashboard queries once for a profile that doesn't exist
+    SQLAlchemy 1.3 doesn't cache compiled Query statements, so this can't precompile
+    them; it configures the mappers, builds the ORM loaders and imports everything the
+    first query pulls in lazily, and warms the server side caches of the connection
+    """
+    configure_mappers()
+    repository = TenantRepository(business_profile_id=0)
+    for model in TENANT_MODELS:
+        repository.page(model, limit=1)
+        repository.page(model, limit=1, row_type=READ_MODELS[model])
+        repository.query(model).with_entities(model.status_id).limit(1).all()
+
+
+def warm_up(app):
+    """
+    Prepares a freshly forked worker before it takes traffic, see gunicorn.conf.py
+    Opens pooled connections, loads db.reference.reference_cache and runs the hot queries
+    The number of pooled connections to open is read from WARMUP_CONNECTIONS
+    """
+    global _warm
+
+    start = time.perf_counter()
+    with app.app_context():
+        engine = db.engine
+        # connections inherited from the master process must not be shared with it
+        engine.dispose()
+
+        warm_pool(engine, app.config.get("WARMUP_CONNECTIONS", DEFAULT_WARMUP_CONNECTIONS))
+        load_reference_caches()
+        run_hot_queries()
+        db.session.remove()
+
+    _warm = True
+    log.info("worker warmed up in %.3fs", time.perf_counter() - start)
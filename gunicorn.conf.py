@@ -0,0 +1,24 @@
+# Gunicorn settings, run with:
+#   $ gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+# a worker that doesn't heartbeat for this long is restarted, post_fork included; the
+# warm-up stays well below it because DB_CONNECT_TIMEOUT (app.py) bounds its connects
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def post_fork(server, worker):
+    """
+    Warms up every new worker (connection pool, reference caches, hot queries)
+    before it starts accepting requests
+    """
+    from app import app
+    from db.warmup import warm_up
+
+    try:
+        warm_up(app)
+    except Exception:
+        # a cold worker is better than no worker, the readiness probe reports the database state
+        server.log.exception('Warm-up of worker %s failed', worker.pid)
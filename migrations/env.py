@@ -0,0 +1,81 @@
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+import app  # noqa: F401  registers User, UserPicture and UserCover on db.metadata
+from db.extensions import db
+from db import models  # noqa: F401  registers the tables on db.metadata
+from db.migration_ops import is_dry_run
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# the same variable app.py reads, so migrations always target the app's database
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"])
+
+target_metadata = db.metadata
+
+
+def run_migrations_offline():
+    """
+    Emits the migration SQL to stdout without connecting to the database
+    .. example::
+       $ alembic upgrade head --sql
+    """
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """
+    Runs the migrations against a live connection
+    With `-x dry_run=true` everything runs inside a single transaction that is
+    rolled back, and the online index/backfill operations only print estimates
+    A dry run is refused on databases without transactional DDL (e.g. SQLite)
+    .. example::
+       $ alembic -x dry_run=true upgrade head
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        if not is_dry_run():
+            context.configure(connection=connection, target_metadata=target_metadata)
+            with context.begin_transaction():
+                context.run_migrations()
+            return
+
+        # begun before configure() so that Alembic treats it as an external transaction
+        # and doesn't commit per migration
+        transaction = connection.begin()
+        try:
+            context.configure(connection=connection, target_metadata=target_metadata)
+            if not context.get_impl().transactional_ddl:
+                raise RuntimeError(
+                    "dry_run needs transactional DDL, %s would keep the changes"
+                    % connection.dialect.name
+                )
+            context.run_migrations()
+        finally:
+            transaction.rollback()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
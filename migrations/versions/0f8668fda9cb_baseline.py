@@ -0,0 +1,202 @@
+"""baseline
+
+Revision ID: 0f8668fda9cb
+Revises:
+Create Date: 2026-10-19 10:12:41.381042
+
+Databases that were created with db.create_all() already have this schema and
+should only be stamped:
+    $ alembic stamp 0f8668fda9cb
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f8668fda9cb'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _reference_table(name, id_column, value_column):
+    return op.create_table(
+        name,
+        sa.Column(id_column, sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column(value_column, sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint(id_column),
+    )
+
+
+def upgrade():
+    user_types = _reference_table('user_types', 'user_type_id', 'user_type')
+    business_types = _reference_table('business_types', 'business_type_id', 'business_type')
+    industry_types = _reference_table('industry_types', 'industry_type_id', 'industry_type')
+    statuses = _reference_table('statuses', 'status_id', 'status')
+    equity_types = _reference_table('equity_types', 'equity_type_id', 'equity_type')
+    debt_types = _reference_table('debt_types', 'debt_type_id', 'debt_type')
+
+    op.create_table(
+        'business_profiles',
+        sa.Column('profile_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=20), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('phone_number', sa.String(), nullable=False),
+        sa.Column('user_type_id', sa.Integer(), nullable=False),
+        sa.Column('business_type_id', sa.Integer(), nullable=False),
+        sa.Column('heard_about_by', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('email_verified', sa.Boolean(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('website', sa.String(), nullable=True),
+        sa.Column('business_size', sa.String(), nullable=False),
+        sa.Column('country_code', sa.String(), nullable=False),
+        sa.Column('office_phone_number', sa.String(), nullable=True),
+        sa.Column('address_line_1', sa.String(), nullable=False),
+        sa.Column('address_line_2', sa.String(), nullable=False),
+        sa.Column('city', sa.String(), nullable=False),
+        sa.Column('post_code', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('industry_type_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['business_type_id'], ['business_types.business_type_id']),
+        sa.ForeignKeyConstraint(['industry_type_id'], ['industry_types.industry_type_id']),
+        sa.ForeignKeyConstraint(['user_type_id'], ['user_types.user_type_id']),
+        sa.PrimaryKeyConstraint('profile_id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'deals',
+        sa.Column('deal_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('business_profile_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('status_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['business_profile_id'], ['business_profiles.profile_id']),
+        sa.PrimaryKeyConstraint('deal_id'),
+    )
+    op.create_table(
+        'transactions',
+        sa.Column('transaction_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('business_profile_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('status_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['business_profile_id'], ['business_profiles.profile_id']),
+        sa.PrimaryKeyConstraint('transaction_id'),
+    )
+    op.create_table(
+        'projects',
+        sa.Column('project_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('business_profile_id', sa.Integer(), nullable=False),
+        sa.Column('status_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('region', sa.String(), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('industry_type_id', sa.Integer(), nullable=False),
+        sa.Column('funded_by_equity', sa.Boolean(), nullable=False),
+        sa.Column('equity_type_id', sa.Integer(), nullable=True),
+        sa.Column('funded_by_debt', sa.Boolean(), nullable=False),
+        sa.Column('debt_type_id', sa.Integer(), nullable=True),
+        sa.Column('revenue', sa.Integer(), nullable=True),
+        sa.Column('ebitda', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['business_profile_id'], ['business_profiles.profile_id']),
+        sa.ForeignKeyConstraint(['debt_type_id'], ['debt_types.debt_type_id']),
+        sa.ForeignKeyConstraint(['equity_type_id'], ['equity_types.equity_type_id']),
+        sa.ForeignKeyConstraint(['industry_type_id'], ['industry_types.industry_type_id']),
+        sa.ForeignKeyConstraint(['status_id'], ['statuses.status_id']),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+
+    # models defined in app.py
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=True),
+        sa.Column('email', sa.String(length=50), nullable=True),
+        sa.Column('password', sa.Text(), nullable=True),
+        sa.Column('grad_year', sa.Integer(), nullable=True),
+        sa.Column('current_work', sa.Integer(), nullable=True),
+        sa.Column('admin_auth', sa.Boolean(), nullable=True),
+        sa.Column('resume', sa.LargeBinary(), nullable=True),
+        sa.Column('resume_public', sa.Boolean(), nullable=True),
+        sa.Column('roles', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_user_email', 'user', ['email'], unique=True)
+    for table_name in ('user_picture', 'user_cover'):
+        # columns of sqlalchemy_imageattach.entity.Image
+        op.create_table(
+            table_name,
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('width', sa.Integer(), nullable=False),
+            sa.Column('height', sa.Integer(), nullable=False),
+            sa.Column('mimetype', sa.String(length=255), nullable=False),
+            sa.Column('original', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('user_id', 'width', 'height'),
+        )
+
+    # reference data, previously inserted by the after_create listeners in db/models.py
+    op.bulk_insert(user_types, [
+        {'user_type_id': 1, 'user_type': 'Free'},
+        {'user_type_id': 2, 'user_type': 'Paid'},
+    ])
+    op.bulk_insert(business_types, [
+        {'business_type_id': 1, 'business_type': 'Non-Profit'},
+        {'business_type_id': 2, 'business_type': 'For-Profit'},
+    ])
+    op.bulk_insert(industry_types, [
+        {'industry_type_id': 1, 'industry_type': 'EdTech'},
+        {'industry_type_id': 2, 'industry_type': 'FinTech'},
+    ])
+    op.bulk_insert(statuses, [
+        {'status_id': 1, 'status': 'Pending'},
+        {'status_id': 2, 'status': 'Completed'},
+        {'status_id': 3, 'status': 'Rejected'},
+        {'status_id': 4, 'status': 'Active'},
+        {'status_id': 5, 'status': 'Approved'},
+        {'status_id': 6, 'status': 'Non-Active'},
+    ])
+    op.bulk_insert(equity_types, [
+        {'equity_type_id': 1, 'equity_type': 'Development Capital'},
+        {'equity_type_id': 2, 'equity_type': 'Private Equity'},
+        {'equity_type_id': 3, 'equity_type': 'Venture Capital'},
+    ])
+    op.bulk_insert(debt_types, [
+        {'debt_type_id': 1, 'debt_type': 'Bridge Finance'},
+        {'debt_type_id': 2, 'debt_type': 'Corporate Debt'},
+        {'debt_type_id': 3, 'debt_type': 'Mezzanine'},
+    ])
+
+    # explicit ids bypass the serial sequences, move them past the seeded rows
+    if op.get_context().dialect.name == 'postgresql':
+        for table, column in (
+                ('user_types', 'user_type_id'),
+                ('business_types', 'business_type_id'),
+                ('industry_types', 'industry_type_id'),
+                ('statuses', 'status_id'),
+                ('equity_types', 'equity_type_id'),
+                ('debt_types', 'debt_type_id'),
+        ):
+            op.execute(
+                "SELECT setval(pg_get_serial_sequence('{0}', '{1}'), "
+                "(SELECT MAX({1}) FROM {0}))".format(table, column)
+            )
+
+
+def downgrade():
+    op.drop_table('user_cover')
+    op.drop_table('user_picture')
+    op.drop_index('ix_user_email', table_name='user')
+    op.drop_table('user')
+    op.drop_table('projects')
+    op.drop_table('transactions')
+    op.drop_table('deals')
+    op.drop_table('business_profiles')
+    op.drop_table('debt_types')
+    op.drop_table('equity_types')
+    op.drop_table('statuses')
+    op.drop_table('industry_types')
+    op.drop_table('business_types')
+    op.drop_table('user_types')
@@ -0,0 +1,31 @@
+"""tenant covering indexes
+
+Revision ID: 2c92a1bc9f18
+Revises: 0f8668fda9cb
+Create Date: 2026-10-19 11:03:27.904316
+
+"""
+from db.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '2c92a1bc9f18'
+down_revision = '0f8668fda9cb'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_deals_business_profile_id_status_id_deal_id', 'deals', 'deal_id'),
+    ('ix_transactions_business_profile_id_status_id_transaction_id', 'transactions', 'transaction_id'),
+    ('ix_projects_business_profile_id_status_id_project_id', 'projects', 'project_id'),
+)
+
+
+def upgrade():
+    for index_name, table_name, pk in INDEXES:
+        create_index_concurrently(index_name, table_name, ['business_profile_id', 'status_id', pk])
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        drop_index_concurrently(index_name, table_name)
@@ -0,0 +1,85 @@
+"""hash business profile passwords
+
+Revision ID: 42099d5413de
+Revises: 2c92a1bc9f18
+Create Date: 2026-10-19 13:40:12.518270
+
+BusinessProfile used to store plaintext passwords. Hashes them in place so that
+BusinessProfile.check_password works for existing profiles. Rows are read in
+batches of BATCH_SIZE and every row is updated and committed on its own, so only
+one row is locked at a time. The plaintext can't be restored, downgrade is a no-op.
+With --sql only a comment is emitted for this revision, the hashing has to run online.
+
+"""
+import time
+
+from alembic import context, op
+import sqlalchemy as sa
+from werkzeug.security import generate_password_hash
+
+from db.migration_ops import estimate_rows, is_dry_run, log
+
+
+# revision identifiers, used by Alembic.
+revision = '42099d5413de'
+down_revision = '2c92a1bc9f18'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+HASH_PREFIX = 'pbkdf2:'
+
+business_profiles = sa.table(
+    'business_profiles',
+    sa.column('profile_id', sa.Integer),
+    sa.column('password', sa.String),
+)
+
+
+def upgrade():
+    if context.is_offline_mode():
+        # the hashing happens in python, it can't be part of a generated SQL script; the
+        # script still records this revision, so it has to be run again online afterwards
+        message = ('hash passwords on business_profiles is skipped with --sql, hash them with: '
+                   'alembic stamp 2c92a1bc9f18 && alembic upgrade 42099d5413de && alembic stamp head')
+        log.warning(message)
+        op.get_context().impl.static_output('-- %s' % message)
+        return
+
+    if is_dry_run():
+        # the pbkdf2 hashing dominates the cost, time one hash on this machine
+        start = time.perf_counter()
+        generate_password_hash('dry run')
+        seconds_per_row = time.perf_counter() - start
+
+        rows = estimate_rows('business_profiles')
+        log.info('[dry run] hash passwords on business_profiles: up to ~%d rows, ~%.1fs estimated',
+                 rows, rows * seconds_per_row)
+        return
+
+    last_id = 0
+    with op.get_context().autocommit_block():
+        # every update commits on its own, only one row is locked at a time
+        bind = op.get_bind()
+        while True:
+            rows = bind.execute(
+                sa.select([business_profiles.c.profile_id, business_profiles.c.password])
+                .where(business_profiles.c.profile_id > last_id)
+                .where(sa.not_(business_profiles.c.password.startswith(HASH_PREFIX)))
+                .order_by(business_profiles.c.profile_id)
+                .limit(BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+
+            for profile_id, password in rows:
+                bind.execute(
+                    business_profiles.update()
+                    .where(business_profiles.c.profile_id == profile_id)
+                    .values(password=generate_password_hash(password))
+                )
+            last_id = rows[-1][0]
+
+
+def downgrade():
+    pass
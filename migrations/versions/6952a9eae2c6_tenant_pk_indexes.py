@@ -0,0 +1,34 @@
+"""tenant primary key indexes
+
+Revision ID: 6952a9eae2c6
+Revises: 42099d5413de
+Create Date: 2026-10-20 09:21:55.730114
+
+Pages that aren't filtered on status are ordered by primary key, which the
+(business_profile_id, status_id, <pk>) indexes can't return in order.
+
+"""
+from db.migration_ops import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '6952a9eae2c6'
+down_revision = '42099d5413de'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_deals_business_profile_id_deal_id', 'deals', 'deal_id'),
+    ('ix_transactions_business_profile_id_transaction_id', 'transactions', 'transaction_id'),
+    ('ix_projects_business_profile_id_project_id', 'projects', 'project_id'),
+)
+
+
+def upgrade():
+    for index_name, table_name, pk in INDEXES:
+        create_index_concurrently(index_name, table_name, ['business_profile_id', pk])
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        drop_index_concurrently(index_name, table_name)
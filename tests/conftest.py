@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from flask import Flask
+
+from db.extensions import db
+from db.models import BusinessProfile, Deal, Project, Transaction
+from db.reference import REFERENCE_MODELS, reference_cache
+from db.repositories import count_cache
+
+TABLES = [model.__table__ for model in REFERENCE_MODELS + (BusinessProfile, Deal, Transaction, Project)]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'postgres: needs the scratch postgres database in TEST_DATABASE_URL, skipped without it'
+    )
+
+
+def create_app(database_url: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+@pytest.fixture
+def app():
+    """
+    App bound to a fresh in-memory SQLite database holding the business profile and
+    per-profile tables and the (seeded) reference tables
+    """
+    app = create_app('sqlite://')
+    with app.app_context():
+        db.metadata.create_all(bind=db.engine, tables=TABLES)
+        count_cache.clear()
+        reference_cache.clear()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def postgres_app():
+    """
+    Same as `app` on the postgres database in TEST_DATABASE_URL, the tables are dropped
+    afterwards so it must be a scratch database
+    """
+    database_url = os.getenv('TEST_DATABASE_URL')
+    if not database_url:
+        pytest.skip('TEST_DATABASE_URL is not set')
+
+    app = create_app(database_url)
+    with app.app_context():
+        db.metadata.create_all(bind=db.engine, tables=TABLES)
+        count_cache.clear()
+        reference_cache.clear()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.metadata.drop_all(bind=db.engine, tables=TABLES)
@@ -0,0 +1,261 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError, IntegrityError
+from werkzeug.security import check_password_hash
+
+from db import ingestion
+from db.extensions import db
+from db.ingestion import (
+    DUPLICATE, INSERTED, INVALID, PROFILE_TABLE, UPDATED, _classify, _ingest_batch, _write_statement,
+    ingest_business_profiles, normalise_profile,
+)
+from db.models import BusinessProfile
+
+
+def record(**overrides):
+    values = {
+        'name': 'Acme',
+        'country': 'Kenya',
+        'phone_number': '+254 (700) 123-456',
+        'user_type_id': 1,
+        'business_type_id': 1,
+        'heard_about_by': 'partner',
+        'email': ' Info@Acme.COM ',
+        'password': 'secret',
+        'business_size': '10',
+        'country_code': '254',
+        'address_line_1': '1 Main Road',
+        'address_line_2': 'Westlands',
+        'city': 'Nairobi',
+        'post_code': '00100',
+        'industry_type_id': 2,
+    }
+    values.update(overrides)
+    return values
+
+
+def test_normalises_contact_fields_and_hashes_the_password():
+    row, errors = normalise_profile(record())
+
+    assert errors == []
+    assert row['email'] == 'info@acme.com'
+    assert row['phone_number'] == '+254700123456'
+    assert row['country_code'] == '+254'
+    assert row['password'] != 'secret'
+    assert check_password_hash(row['password'], 'secret')
+
+
+def test_fields_without_a_value_are_left_out():
+    row, _ = normalise_profile(record(website='  ', description=None))
+
+    assert 'website' not in row
+    assert 'description' not in row
+    assert 'email_verified' not in row
+
+
+def test_numbers_are_coerced_to_the_column_types():
+    row, errors = normalise_profile(record(phone_number=5551234567, business_size=10, user_type_id='2'))
+
+    assert errors == []
+    assert row['phone_number'] == '5551234567'
+    assert row['business_size'] == '10'
+    assert row['user_type_id'] == 2
+
+
+def test_values_of_the_wrong_type_are_invalid_instead_of_raising():
+    row, errors = normalise_profile(record(name=['Acme'], email_verified='maybe', user_type_id=1.5))
+
+    assert row is None
+    assert len(errors) == 3
+
+
+def test_missing_and_malformed_fields_are_reported():
+    row, errors = normalise_profile(record(city=None, email='not-an-email'))
+    assert row is None
+    assert errors == ['missing field: city']
+
+    row, errors = normalise_profile(record(email='not-an-email', name='x' * 30, country_code='??'))
+    assert row is None
+    assert len(errors) == 3
+
+
+def test_classify_reports_duplicates():
+    batch = [
+        (0, {'email': 'new@a.com', 'name': 'New'}),
+        (1, {'email': 'new@a.com', 'name': 'Other'}),
+        (2, {'email': 'old@a.com', 'name': 'Old'}),
+        (3, {'email': 'else@a.com', 'name': 'Taken'}),
+    ]
+    existing = [(7, 'Old', 'old@a.com'), (8, 'Taken', 'taken@a.com')]
+
+    outcomes = [None] * len(batch)
+    rows = _classify(batch, existing, outcomes, update_existing=False)
+    assert [index for index, _ in rows] == [0]
+    assert [outcome.errors for outcome in outcomes[1:]] == [
+        ['duplicate within import'], ['email already registered'], ['name already taken'],
+    ]
+    assert all(outcome.status == DUPLICATE for outcome in outcomes[1:])
+
+    outcomes = [None] * len(batch)
+    rows = _classify(batch, existing, outcomes, update_existing=True)
+    assert [index for index, _ in rows] == [0, 2]
+    assert outcomes[3].errors == ['name already taken']
+
+
+def test_out_of_range_integers_and_unknown_reference_ids_are_invalid():
+    row, errors = normalise_profile(record(industry_type_id='99999999999'))
+    assert row is None
+    assert errors == ['invalid industry_type_id: 99999999999 is out of range']
+
+    reference = {'user_type_id': {1, 2}, 'business_type_id': {1, 2}, 'industry_type_id': {1, 2}}
+    row, errors = normalise_profile(record(user_type_id=99), reference)
+    assert row is None
+    assert errors == ['unknown user_type_id: 99']
+
+    row, errors = normalise_profile(record(), reference)
+    assert errors == []
+
+
+def test_write_statement_only_updates_the_given_columns():
+    row, _ = normalise_profile(record())
+    columns = tuple(sorted(row))
+    dialect = postgresql.dialect()
+
+    sql = str(_write_statement([(0, row)], columns, update_existing=True).compile(dialect=dialect))
+    assert sql.endswith('RETURNING business_profiles.profile_id, business_profiles.email')
+    update = sql.split('ON CONFLICT (email) DO UPDATE SET ')[1]
+    assert 'name = excluded.name' in update
+    assert 'email = excluded.email' not in update
+    assert 'website' not in update
+    assert 'email_verified' not in update
+
+    sql = str(_write_statement([(0, row)], columns, update_existing=False).compile(dialect=dialect))
+    assert 'ON CONFLICT DO NOTHING' in sql
+
+
+class PgError(Exception):
+    def __init__(self, message, pgcode):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+def stub_write(monkeypatch, errors=None, skipped=()):
+    """
+    Replaces _write, which needs postgres, with one returning an id per written email
+    `errors` maps the names the "database" refuses to their exception, the emails in
+    `skipped` are left out as if ON CONFLICT DO NOTHING had skipped them
+    Returns the list of (indexes, columns) written
+    """
+    calls = []
+
+    def write(rows, columns, update_existing):
+        calls.append(([index for index, _ in rows], columns))
+        for _, row in rows:
+            if row['name'] in (errors or {}):
+                raise errors[row['name']]
+        return {row['email']: 100 + index for index, row in rows if row['email'] not in skipped}
+
+    monkeypatch.setattr(ingestion, '_write', write)
+    return calls
+
+
+def add_profile(name, email):
+    db.session.execute(PROFILE_TABLE.insert().values(
+        name=name, country='Kenya', phone_number='+254700123456', user_type_id=1, business_type_id=1,
+        heard_about_by='partner', email=email, email_verified=True, password='hash', business_size='10',
+        country_code='+254', address_line_1='1 Main Road', address_line_2='Westlands', city='Nairobi',
+        post_code='00100', industry_type_id=1,
+    ))
+    db.session.commit()
+
+
+def test_ingest_batch_reports_inserted_and_updated_rows(app, monkeypatch):
+    add_profile('Old', 'old@a.com')
+    calls = stub_write(monkeypatch)
+    batch = [
+        (0, {'email': 'new@a.com', 'name': 'New'}),
+        (1, {'email': 'old@a.com', 'name': 'Old', 'website': 'old.com'}),
+        (2, {'email': 'two@a.com', 'name': 'Two'}),
+    ]
+
+    outcomes = [None] * len(batch)
+    _ingest_batch(batch, outcomes, update_existing=True)
+
+    assert [(outcome.status, outcome.profile_id) for outcome in outcomes] == [
+        (INSERTED, 100), (UPDATED, 101), (INSERTED, 102),
+    ]
+    # rows with the same fields share one statement
+    assert calls == [([0, 2], ('email', 'name')), ([1], ('email', 'name', 'website'))]
+
+
+def test_ingest_batch_reports_profiles_created_concurrently(app, monkeypatch):
+    stub_write(monkeypatch, skipped={'late@a.com'})
+    batch = [(0, {'email': 'new@a.com', 'name': 'New'}), (1, {'email': 'late@a.com', 'name': 'Late'})]
+
+    outcomes = [None] * len(batch)
+    _ingest_batch(batch, outcomes, update_existing=False)
+
+    assert outcomes[0].status == INSERTED
+    assert (outcomes[1].status, outcomes[1].errors) == (DUPLICATE, ['created concurrently'])
+
+
+def test_ingest_batch_retries_one_by_one_after_a_database_error(app, monkeypatch):
+    calls = stub_write(monkeypatch, errors={
+        'Taken': IntegrityError('INSERT', {}, PgError('duplicate key value violates unique constraint', '23505')),
+        'Huge': DataError('INSERT', {}, PgError('integer out of range', '22003')),
+    })
+    batch = [
+        (0, {'email': 'new@a.com', 'name': 'New'}),
+        (1, {'email': 'taken@a.com', 'name': 'Taken'}),
+        (2, {'email': 'huge@a.com', 'name': 'Huge'}),
+    ]
+
+    outcomes = [None] * len(batch)
+    _ingest_batch(batch, outcomes, update_existing=False)
+
+    assert [call[0] for call in calls] == [[0, 1, 2], [0], [1], [2]]
+    assert (outcomes[0].status, outcomes[0].profile_id) == (INSERTED, 100)
+    assert outcomes[1].status == DUPLICATE
+    assert outcomes[1].errors == ['conflict: duplicate key value violates unique constraint']
+    assert outcomes[2].status == INVALID
+    assert outcomes[2].errors == ['rejected by the database: integer out of range']
+
+
+def test_ingest_business_profiles_reports_every_record(app, monkeypatch):
+    add_profile('Old', 'old@a.com')
+    stub_write(monkeypatch)
+    records = [
+        record(),
+        record(name='Old', email='old@a.com'),
+        record(name='Other', email='other@a.com', user_type_id=99),
+        record(name='Bad', email=None),
+        record(name='Acme', email='again@a.com'),
+    ]
+
+    outcomes = ingest_business_profiles(records, batch_size=3, workers=2)
+
+    assert [outcome.index for outcome in outcomes] == [0, 1, 2, 3, 4]
+    assert [outcome.status for outcome in outcomes] == [INSERTED, DUPLICATE, INVALID, INVALID, DUPLICATE]
+    assert outcomes[2].errors == ['unknown user_type_id: 99']
+    assert outcomes[4].errors == ['duplicate within import']
+
+
+@pytest.mark.postgres
+def test_ingest_business_profiles_on_postgres(postgres_app):
+    add_profile('Old', 'old@a.com')
+    records = [
+        record(),
+        record(name='Old', email='OLD@a.com', website='old.com'),
+        record(name='Acme', email='again@a.com'),
+        record(name='Other', email='other@a.com', industry_type_id=99),
+    ]
+
+    outcomes = ingest_business_profiles(records, workers=2, update_existing=True)
+
+    assert [outcome.status for outcome in outcomes] == [INSERTED, UPDATED, DUPLICATE, INVALID]
+    old = BusinessProfile.query.filter_by(email='old@a.com').one()
+    assert old.profile_id == outcomes[1].profile_id
+    assert old.website == 'old.com'
+    # not part of the records, so not overwritten
+    assert old.email_verified is True
+    assert BusinessProfile.query.filter_by(email='info@acme.com').one().profile_id == outcomes[0].profile_id
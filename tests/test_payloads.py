@@ -0,0 +1,88 @@
+import gzip
+import zlib
+
+import pytest
+from flask import Flask, jsonify
+
+from db.read_models import DealRow
+from web.compression import init_compression
+from web.payloads import compact, list_response, payload_metrics
+
+FIELDS = ('id', 'name')
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/big')
+    def big():
+        return list_response([{'id': i, 'name': 'name %d' % i} for i in range(200)], fields=FIELDS)
+
+    @app.route('/empty')
+    def empty():
+        return list_response([], fields=FIELDS)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'id': 1})
+
+    @app.route('/partial')
+    def partial():
+        return jsonify(['x'] * 1000), 206
+
+    payload_metrics.clear()
+    return app.test_client()
+
+
+def test_compact_puts_the_keys_in_a_header_row():
+    assert compact([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]) == [['id', 'name'], [1, 'a'], [2, 'b']]
+    assert compact([{'name': 'a', 'id': 1}], fields=FIELDS) == [['id', 'name'], [1, 'a']]
+
+
+def test_compact_of_an_empty_list_keeps_the_header_when_fields_are_given():
+    assert compact([], fields=FIELDS) == [['id', 'name']]
+    assert compact([]) == []
+
+
+def test_compact_read_models():
+    rows = [DealRow(1, 2, 'x', '1'), DealRow(2, 2, 'y', '1')]
+    assert compact(rows) == [['deal_id', 'business_profile_id', 'name', 'status_id'], [1, 2, 'x', '1'], [2, 2, 'y', '1']]
+    assert compact(rows, fields=('name', 'deal_id')) == [['name', 'deal_id'], ['x', 1], ['y', 2]]
+
+
+def test_list_response_formats(client):
+    assert client.get('/big').json[0] == {'id': 0, 'name': 'name 0'}
+    assert client.get('/big?format=compact').json[:2] == [['id', 'name'], [0, 'name 0']]
+    assert client.get('/empty?format=compact').json == [['id', 'name']]
+    assert client.get('/empty').json == []
+
+
+def test_large_responses_are_compressed(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data).startswith(b'[')
+
+    response = client.get('/big', headers={'Accept-Encoding': 'deflate'})
+    assert response.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(response.data).startswith(b'[')
+
+    assert 'Content-Encoding' not in client.get('/big').headers
+
+
+def test_small_and_partial_responses_are_not_compressed(client):
+    headers = {'Accept-Encoding': 'gzip'}
+    assert 'Content-Encoding' not in client.get('/small', headers=headers).headers
+    assert 'Content-Encoding' not in client.get('/partial', headers=headers).headers
+
+
+def test_payload_sizes_are_recorded_per_route(client):
+    client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    client.get('/big')
+
+    stats = payload_metrics.snapshot()['big']
+    assert stats['responses'] == 2
+    assert stats['sent_bytes'] < stats['raw_bytes']
+    assert stats['max_raw_bytes'] == stats['raw_bytes'] // 2
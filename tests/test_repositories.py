@@ -0,0 +1,100 @@
+from db.extensions import db
+from db.models import Deal
+from db.read_models import DealRow
+from db.repositories import TenantRepository, count_cache
+
+
+def add_deals(business_profile_id, statuses):
+    for i, status_id in enumerate(statuses):
+        db.session.add(Deal(name='deal %d' % i, business_profile_id=business_profile_id, status_id=status_id))
+    db.session.commit()
+
+
+def test_keyset_paging_stays_within_the_profile(app):
+    add_deals(1, ['1', '2', '1', '2', '1'])
+    add_deals(2, ['1', '1'])
+    repository = TenantRepository(1, page_size=2)
+
+    first = repository.deals()
+    second = repository.deals(after=first.next_after)
+    last = repository.deals(after=second.next_after)
+
+    ids = [deal.deal_id for page in (first, second, last) for deal in page.items]
+    assert ids == [1, 2, 3, 4, 5]
+    assert last.next_after is None
+    assert all(deal.business_profile_id == 1 for page in (first, second, last) for deal in page.items)
+
+
+def test_paging_by_status_and_read_models(app):
+    add_deals(1, ['1', '2', '1', '2', '1'])
+    page = TenantRepository(1).deals(status_id='1', row_type=DealRow)
+
+    assert [row.deal_id for row in page.items] == [1, 3, 5]
+    assert all(isinstance(row, DealRow) for row in page.items)
+
+
+def test_pages_are_read_in_index_order(app):
+    repository = TenantRepository(1)
+    for status_id in (None, '1'):
+        query = repository.query(Deal)
+        if status_id is not None:
+            query = query.filter(Deal.status_id == status_id)
+        statement = query.order_by(Deal.deal_id).limit(3).statement.compile(
+            dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}
+        )
+        plan = ' '.join(str(row) for row in db.session.execute('EXPLAIN QUERY PLAN %s' % statement))
+        assert 'TEMP B-TREE' not in plan
+        assert 'ix_deals_business_profile_id' in plan
+
+
+def test_counts_are_cached_until_commit(app):
+    add_deals(1, ['1', '2', '1'])
+    repository = TenantRepository(1)
+    assert repository.counts_by_status(Deal) == {'1': 2, '2': 1}
+
+    db.session.add(Deal(name='new', business_profile_id=1, status_id='2'))
+    db.session.flush()
+    assert count_cache.get('deals', 1) == {'1': 2, '2': 1}
+
+    db.session.commit()
+    assert count_cache.get('deals', 1) is None
+    assert repository.count(Deal) == 4
+    assert repository.count(Deal, '2') == 2
+
+
+def test_counts_queried_before_an_invalidation_are_not_cached(app):
+    generation = count_cache.generation('deals', 1)
+    count_cache.invalidate('deals', 1)
+    count_cache.set('deals', 1, {'1': 1}, generation)
+    assert count_cache.get('deals', 1) is None
+
+
+def test_returned_counts_are_copies(app):
+    add_deals(1, ['1'])
+    repository = TenantRepository(1)
+    repository.counts_by_status(Deal)['1'] = 100
+    assert repository.counts_by_status(Deal) == {'1': 1}
+
+
+def test_dashboard_names_the_statuses_from_the_reference_cache(app):
+    add_deals(1, ['1', '4', '4'])
+    dashboard = TenantRepository(1).dashboard()
+
+    assert dashboard['deals']['counts'] == {'1': 1, '4': 2}
+    assert dashboard['deals']['status_names'] == {'1': 'Pending', '4': 'Active'}
+    assert dashboard['deals']['total'] == 3
+    assert dashboard['projects']['total'] == 0
+
+
+def test_moving_a_row_invalidates_both_profiles(app):
+    add_deals(1, ['1'])
+    add_deals(2, ['1'])
+    assert TenantRepository(1).count(Deal) == 1
+    assert TenantRepository(2).count(Deal) == 1
+
+    deal = Deal.query.filter_by(business_profile_id=1).one()
+    deal.business_profile_id = 2
+    db.session.commit()
+
+    assert TenantRepository(1).count(Deal) == 0
+    assert TenantRepository(2).count(Deal) == 2
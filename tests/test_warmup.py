@@ -0,0 +1,25 @@
+from flask import Flask
+
+from db import warmup
+from db.extensions import db
+from db.reference import reference_cache, status_name
+
+
+def test_warm_up_loads_the_reference_tables_and_runs_the_hot_queries(tmp_path):
+    app = Flask(__name__)
+    # a file, the warm-up disposes the engine which would drop an in-memory database
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///%s' % (tmp_path / 'warmup.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    reference_cache.clear()
+
+    warmup.warm_up(app)
+
+    assert warmup.is_warm()
+    assert reference_cache['statuses'][2].status == 'Completed'
+    assert status_name('6') == 'Non-Active'
+    assert status_name('unknown') is None
+    with app.app_context():
+        assert warmup.probe(db.engine) >= 0
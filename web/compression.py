@@ -0,0 +1,97 @@
+import gzip
+import logging
+import zlib
+
+from flask import request
+
+from web.payloads import payload_metrics
+
+try:
+    import brotli
+except ImportError:  # optional, gzip/deflate from the standard library are always available
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+DEFAULT_PAYLOAD_BUDGET = 256 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+)
+
+log = logging.getLogger(__name__)
+
+
+def available_encodings():
+    """
+    Content codings we can produce, in order of preference
+    """
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+    return encodings
+
+
+def compress(data: bytes, encoding: str, level: int = DEFAULT_LEVEL,
+             brotli_quality: int = DEFAULT_BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level)
+    if encoding == "deflate":
+        return zlib.compress(data, level)
+    raise ValueError("unsupported content coding: %s" % encoding)
+
+
+def init_compression(app):
+    """
+    Compresses responses according to the client's Accept-Encoding and records the
+    payload size of every route in web.payloads.payload_metrics
+    Settings:
+     COMPRESS_MIN_SIZE: bodies smaller than this are sent as is
+     COMPRESS_LEVEL: gzip/deflate level
+     COMPRESS_BROTLI_QUALITY: brotli quality, when the brotli package is installed
+     COMPRESS_TYPES: mimetypes that are compressed
+     PAYLOAD_BUDGET_BYTES: uncompressed size above which a warning is logged
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE)
+    app.config.setdefault("COMPRESS_LEVEL", DEFAULT_LEVEL)
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", DEFAULT_BROTLI_QUALITY)
+    app.config.setdefault("COMPRESS_TYPES", COMPRESSIBLE_TYPES)
+    app.config.setdefault("PAYLOAD_BUDGET_BYTES", DEFAULT_PAYLOAD_BUDGET)
+
+    @app.after_request
+    def compress_response(response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+
+        data = response.get_data()
+        raw_size = len(data)
+        endpoint = request.endpoint or "unknown"
+
+        over_budget = raw_size > app.config["PAYLOAD_BUDGET_BYTES"]
+        if over_budget:
+            log.warning("%s returned %d bytes, over the payload budget of %d bytes",
+                        endpoint, raw_size, app.config["PAYLOAD_BUDGET_BYTES"])
+
+        if (response.mimetype in app.config["COMPRESS_TYPES"]
+                and response.status_code == 200
+                and "Content-Encoding" not in response.headers):
+            response.vary.add("Accept-Encoding")
+            encoding = request.accept_encodings.best_match(available_encodings())
+            if encoding and raw_size >= app.config["COMPRESS_MIN_SIZE"]:
+                response.set_data(compress(
+                    data,
+                    encoding,
+                    app.config["COMPRESS_LEVEL"],
+                    app.config["COMPRESS_BROTLI_QUALITY"],
+                ))
+                response.headers["Content-Encoding"] = encoding
+
+        payload_metrics.record(endpoint, raw_size, response.content_length or 0, over_budget)
+        return response
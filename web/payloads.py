@@ -0,0 +1,94 @@
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from flask import jsonify, request
+
+COMPACT_FORMAT = "compact"
+
+
+@dataclass
+class PayloadStats:
+    """
+    Response sizes of one route
+     :param responses: number of responses measured
+     :param raw_bytes: total size of the bodies before compression
+     :param sent_bytes: total size of the bodies as sent
+     :param max_raw_bytes: biggest body before compression
+     :param over_budget: number of responses bigger than PAYLOAD_BUDGET_BYTES
+    """
+
+    responses: int = 0
+    raw_bytes: int = 0
+    sent_bytes: int = 0
+    max_raw_bytes: int = 0
+    over_budget: int = 0
+
+
+class PayloadMetrics:
+    """
+    Per-process response size counters keyed on the Flask endpoint
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, PayloadStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, raw_bytes: int, sent_bytes: int, over_budget: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, PayloadStats())
+            stats.responses += 1
+            stats.raw_bytes += raw_bytes
+            stats.sent_bytes += sent_bytes
+            stats.max_raw_bytes = max(stats.max_raw_bytes, raw_bytes)
+            stats.over_budget += over_budget
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {endpoint: asdict(stats) for endpoint, stats in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+payload_metrics = PayloadMetrics()
+
+
+def compact(rows: Sequence[Any], fields: Optional[Sequence[str]] = None) -> List[List[Any]]:
+    """
+    Turns a list of dicts (or read model tuples) into an array of arrays whose first
+    row holds the keys, so that they aren't repeated for every row
+    Without `fields` the keys are taken from the first row, so an empty list has no header
+    .. example::
+       >>> compact([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}])
+       [['id', 'name'], [1, 'a'], [2, 'b']]
+       >>> compact([], fields=('id', 'name'))
+       [['id', 'name']]
+    """
+    if not rows:
+        return [list(fields)] if fields else []
+    first = rows[0]
+    if hasattr(first, "_fields"):
+        if fields is None or tuple(fields) == first._fields:
+            return [list(first._fields)] + [list(row) for row in rows]
+        return [list(fields)] + [[getattr(row, key) for key in fields] for row in rows]
+    header = list(fields) if fields else list(first.keys())
+    return [header] + [[row[key] for key in header] for row in rows]
+
+
+def wants_compact() -> bool:
+    return request.args.get("format") == COMPACT_FORMAT
+
+
+def list_response(rows: Sequence[Any], fields: Optional[Sequence[str]] = None):
+    """
+    JSON response for list endpoints, compact when the client asks for `?format=compact`
+    `fields` gives the columns (and their order) of the compact header row, it should
+    be passed whenever the list can be empty
+    """
+    if wants_compact():
+        return jsonify(compact(rows, fields))
+    if rows and hasattr(rows[0], "_asdict"):
+        rows = [row._asdict() for row in rows]
+    return jsonify(list(rows))